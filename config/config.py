@@ -9,3 +9,13 @@ DB_PASS = os.environ.get("DB_PASS")
 DB_NAME = os.environ.get("DB_NAME")
 DB_PORT = os.environ.get("DB_PORT")
 
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+
+MAX_CONCURRENT_DOWNLOADS = int(os.environ.get("MAX_CONCURRENT_DOWNLOADS", 16))
+# Seconds the running downloads are given to complete on shutdown before they are cancelled.
+DOWNLOAD_SHUTDOWN_TIMEOUT = float(os.environ.get("DOWNLOAD_SHUTDOWN_TIMEOUT", 20))
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", os.cpu_count() or 1))
+
+# Hosts trusted to serve downloads, for which the URL is not validated with a HEAD request.
+URL_VALIDATION_SKIP_HOSTS = os.environ.get("URL_VALIDATION_SKIP_HOSTS", "ftp.ncbi.nlm.nih.gov").split(",")
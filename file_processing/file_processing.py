@@ -1,13 +1,33 @@
 import aiohttp
-import gzip
-import io
+import asyncpg
+import asyncio
+import collections
 import logging
-from typing import Optional
+import re
+import threading
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from sqlalchemy import text, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from services.database.models.file import File
+from services.database.models.file import File, FileAccession
+from services.database.notifications import STATUS_CHANNEL
+from services.parse_pool.parse_pool import ParsePool
+
+try:
+    from isal import isal_zlib as zlib
+except ImportError:
+    try:
+        from zlib_ng import zlib_ng as zlib
+    except ImportError:
+        import zlib
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -16,8 +36,34 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Size of the chunks read from the HTTP response while streaming a download.
+READ_BUFFER_SIZE = 128 * 1024
+# wbits value telling the decompressor to expect a gzip header and trailer.
+GZIP_WBITS = 31
+# Upper bound of the data decompressed per step. Lines longer than this still accumulate in the buffer.
+DECOMPRESS_BUFFER_SIZE = 1024 * 1024
+# Number of decompressed blocks waiting in the process pool before the download waits for their results.
+MAX_PENDING_PARSES = 8
+# First token following the ACCESSION keyword at the start of a line. Anchoring on the preceding newline
+# instead of ^ lets the regex engine search for the literal prefix rather than trying every position.
+ACCESSION_RE = re.compile(rb"\nACCESSION[ \t]+(\S+)")
+# Same token on the first line of the data, which has no preceding newline.
+LEADING_ACCESSION_RE = re.compile(rb"ACCESSION[ \t]+(\S+)")
+# Token starting at a given position, used to slice the ACCESSION numbers located by Hyperscan.
+TOKEN_RE = re.compile(rb"\S+")
+
+if hyperscan is not None:
+    # Hyperscan reports match ends only, so the pattern stops at the first character of the ACCESSION number.
+    ACCESSION_DB = hyperscan.Database()
+    ACCESSION_DB.compile(expressions=[rb"^ACCESSION[ \t]+\S"], ids=[0], flags=[hyperscan.HS_FLAG_MULTILINE])
+else:
+    ACCESSION_DB = None
+# Per-thread Hyperscan scratch space, allocated on first use.
+hyperscan_scratch = threading.local()
 
-async def download_and_process_file(url: str, task_id: str, session: AsyncSession):
+
+async def download_and_process_file(url: str, task_id: str, session: AsyncSession,
+                                    http_session: aiohttp.ClientSession, parse_pool: ParsePool):
     """
        Downloads a file from the specified URL, decompresses it, parses the content to extract ACCESSION numbers,
        and updates the status of the task in the database.
@@ -26,37 +72,72 @@ async def download_and_process_file(url: str, task_id: str, session: AsyncSessio
            url (str): The URL of the file to download.
            task_id (str): The ID of the task associated with the download.
            session (AsyncSession): The SQLAlchemy async session used to interact with the database.
+           http_session (aiohttp.ClientSession): The shared client session used to download the file.
+           parse_pool (ParsePool): The pool the ACCESSION numbers are extracted in.
 
        Returns:
            None
 
        This function performs the following steps:
        1. Downloads the file from the provided URL.
-       2. Reads and decompresses the file content.
-       3. Extracts ACCESSION numbers from the decompressed file data.
+       2. Streams the response body through a gzip decompressor chunk by chunk, member after member.
+       3. Extracts ACCESSION numbers from the completed lines in the process pool while the download goes on.
        4. Updates the status of the task in the database based on the outcome of these operations.
+
+       The parses still pending when the download stops early are cancelled.
        """
+    pending_parses = collections.deque()
+
     try:
-        async with aiohttp.ClientSession() as client_session:
-            async with client_session.get(url) as response:
-                if response.status != 200:
-                    await update_file_status(session, task_id, "Failed to download")
-                    return
+        async with http_session.get(url) as response:
+            if response.status != 200:
+                await update_file_status(session, task_id, "Failed to download")
+                return
+
+            accession_list = []
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+            buffer = bytearray()
+
+            try:
+                async for chunk in response.content.iter_chunked(READ_BUFFER_SIZE):
+                    while chunk:
+                        if decompressor.eof:
+                            # Concatenated gzip members: the next member starts where the previous one ended.
+                            # Zero padding between or after members is skipped, as gzip.open does.
+                            chunk = chunk.lstrip(b"\x00")
+                            if not chunk:
+                                break
+                            decompressor = zlib.decompressobj(GZIP_WBITS)
 
-                file_content = io.BytesIO(await response.read())
+                        # The buffer holds no newline before the new output, so only the new output is searched.
+                        searched = len(buffer)
+                        buffer += decompressor.decompress(chunk, DECOMPRESS_BUFFER_SIZE)
+                        chunk = decompressor.unused_data if decompressor.eof else decompressor.unconsumed_tail
+                        end = buffer.rfind(b"\n", searched) + 1
+                        if not end:
+                            continue
 
-                try:
-                    with gzip.open(file_content, 'rt') as gzip_file:
-                        file_data = gzip_file.read()
-                except (OSError, gzip.BadGzipFile) as e:
-                    logger.error(f"Failed to decompress file: {e}")
-                    await update_file_status(session, task_id, "Failed to decompress")
-                    return
+                        with memoryview(buffer)[:end] as lines:
+                            block = bytes(lines)
+                        del buffer[:end]
 
-                accession_list = extract_accession_numbers(file_data)
+                        pending_parses.append(asyncio.create_task(parse_block(parse_pool, block)))
+                        if len(pending_parses) > MAX_PENDING_PARSES:
+                            accession_list.extend(await pending_parses.popleft())
 
+                buffer += decompressor.flush()
+                if not decompressor.eof:
+                    raise zlib.error("Compressed data ended before the end-of-stream marker was reached")
+            except zlib.error as e:
+                logger.error(f"Failed to decompress file: {e}")
+                await update_file_status(session, task_id, "Failed to decompress")
+                return
+
+            while pending_parses:
+                accession_list.extend(await pending_parses.popleft())
+            accession_list.extend(extract_accession_numbers(buffer))
 
-                await update_file_status(session, task_id, "Completed", accession_list)
+            await update_file_status(session, task_id, "Completed", accession_list)
 
     except aiohttp.ClientError as e:
         logger.error(f"HTTP request failed: {e}")
@@ -64,45 +145,150 @@ async def download_and_process_file(url: str, task_id: str, session: AsyncSessio
     except Exception as e:
         logger.exception("An unexpected error occurred in download_and_process_file")
         await update_file_status(session, task_id, "Failed due to an unexpected error")
+    finally:
+        # Parses left behind by a failed or cancelled download would keep the pool busy for nothing.
+        for parse in pending_parses:
+            parse.cancel()
+        await asyncio.gather(*pending_parses, return_exceptions=True)
 
 
-def extract_accession_numbers(file_data: str) -> list:
+async def parse_block(parse_pool: ParsePool, block: bytes) -> list:
+    """
+       Extracts the ACCESSION numbers of a block of complete lines in the process pool.
+
+       Args:
+           parse_pool (ParsePool): The pool the ACCESSION numbers are extracted in.
+           block (bytes): The decompressed lines to parse.
+
+       Returns:
+           list: The ACCESSION numbers found in the block.
+
+       If a pool worker died and the pool is broken, the block is parsed inline instead, so the download
+       does not fail on account of the pool. The pool itself is replaced by ParsePool.run.
+       """
+    try:
+        return await parse_pool.run(extract_accession_numbers, block)
+    except BrokenProcessPool:
+        logger.error("The parse pool is broken, parsing the block inline")
+        return extract_accession_numbers(block)
+
+
+def extract_accession_numbers(file_data: Union[bytes, bytearray, memoryview]) -> list:
     """
        Extracts ACCESSION numbers from the provided file data.
 
        Args:
-           file_data (str): The content of the file as a string.
+           file_data (Union[bytes, bytearray, memoryview]): The decompressed content of the file.
 
        Returns:
            list: A list of extracted ACCESSION numbers.
 
-       This function processes the file content line by line, searching for lines that start with "ACCESSION"
-       and extracts the number following this keyword.
+       This function scans the file content for lines that start with "ACCESSION" and captures the number
+       following this keyword. The scan uses a Hyperscan database when the library is installed and a
+       precompiled regular expression otherwise. The content is scanned as bytes, so only the matched
+       numbers are decoded, as UTF-8 with invalid bytes replaced so a malformed number does not fail the file.
+       """
+    if ACCESSION_DB is not None:
+        accessions = find_accessions_with_hyperscan(file_data)
+    else:
+        accessions = find_accessions_with_regex(file_data)
+    return [accession.decode('utf-8', errors='replace') for accession in accessions]
+
+
+def find_accessions_with_hyperscan(file_data: Union[bytes, bytearray, memoryview]) -> list:
+    """
+       Finds the ACCESSION numbers of the file data with the Hyperscan database.
+
+       Args:
+           file_data (Union[bytes, bytearray, memoryview]): The decompressed content of the file.
+
+       Returns:
+           list: The ACCESSION numbers found, as bytes.
+
+       Hyperscan scratch space cannot be shared by concurrent scans, so each thread uses its own.
        """
-    accession_list = []
-    for line in file_data.splitlines():
-        if line.startswith("ACCESSION"):
-            accession_list.append(line.split()[1])
-    return accession_list
+    scratch = getattr(hyperscan_scratch, "scratch", None)
+    if scratch is None:
+        scratch = hyperscan_scratch.scratch = hyperscan.Scratch(ACCESSION_DB)
+
+    match_ends = []
+    ACCESSION_DB.scan(file_data, scratch=scratch,
+                      match_event_handler=lambda pattern_id, start, end, flags, context: match_ends.append(end))
+    return [TOKEN_RE.match(file_data, end - 1).group() for end in match_ends]
+
+
+def find_accessions_with_regex(file_data: Union[bytes, bytearray, memoryview]) -> list:
+    """
+       Finds the ACCESSION numbers of the file data with the precompiled regular expressions.
+
+       Args:
+           file_data (Union[bytes, bytearray, memoryview]): The decompressed content of the file.
+
+       Returns:
+           list: The ACCESSION numbers found, as bytes.
+       """
+    accessions = ACCESSION_RE.findall(file_data)
+    leading = LEADING_ACCESSION_RE.match(file_data)
+    if leading:
+        accessions.insert(0, leading.group(1))
+    return accessions
 
 
 async def update_file_status(session: AsyncSession, task_id: str, status: str, accession_list: Optional[list] = None):
+    values = {"status": status}
+    if accession_list is not None:
+        values["result_count"] = len(accession_list)
+
+    stmt = (
+        update(File)
+        .where(File.download_task_id == task_id)
+        .values(**values)
+        .returning(File.uuid)
+        .execution_options(synchronize_session=False)
+    )
+
     try:
         async with session.begin():
+            result = await session.execute(stmt)
+            file_uuid = result.scalar_one_or_none()
 
-            result = await session.execute(select(File).filter_by(download_task_id=task_id))
-            file_record = result.scalars().first()
-
-            if not file_record:
+            if file_uuid is None:
                 logger.warning(f"No record found for task_id: {task_id}")
                 return
 
-            file_record.status = status
-            if accession_list is not None:
-                file_record.accession_list = accession_list
-                file_record.result_count = len(accession_list)
+            if accession_list:
+                await copy_accession_numbers(session, file_uuid, accession_list)
 
-            await session.commit()
-    except SQLAlchemyError as e:
+            await session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": STATUS_CHANNEL, "payload": f"{task_id}:{status}"},
+            )
+    except (SQLAlchemyError, asyncpg.PostgresError) as e:
         logger.exception("An error occurred while updating the file status")
         await session.rollback()
+
+
+async def copy_accession_numbers(session: AsyncSession, file_uuid: uuid.UUID, accession_list: list):
+    """
+      Bulk-inserts the ACCESSION numbers of a file into the file_accessions table.
+
+      Args:
+          session (AsyncSession): The SQLAlchemy async session used to interact with the database.
+          file_uuid (uuid.UUID): The UUID of the file the ACCESSION numbers belong to.
+          accession_list (list): A list of ACCESSION numbers extracted from the file, in file order.
+
+      Returns:
+          None
+
+      Raises:
+          asyncpg.PostgresError: If the COPY fails. It bypasses SQLAlchemy, so the error is not wrapped in a SQLAlchemyError.
+
+      The rows are sent with a single COPY on the session's asyncpg connection, inside the current transaction.
+      """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        FileAccession.__tablename__,
+        records=((file_uuid, idx, accession) for idx, accession in enumerate(accession_list)),
+        columns=("file_uuid", "idx", "accession"),
+    )
@@ -0,0 +1,37 @@
+"""Index download_task_id
+
+Revision ID: 5c2e8f1a9d47
+Revises: bdcdaffbc3f7
+Create Date: 2026-10-15 10:12:31.214507
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8f1a9d47'
+down_revision: Union[str, None] = 'bdcdaffbc3f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('files', 'download_task_id',
+               existing_type=sa.Integer(),
+               type_=sa.BigInteger(),
+               existing_nullable=False)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_files_download_task_id', 'files', ['download_task_id'], unique=True,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_files_download_task_id', table_name='files', postgresql_concurrently=True)
+    op.alter_column('files', 'download_task_id',
+               existing_type=sa.BigInteger(),
+               type_=sa.Integer(),
+               existing_nullable=False)
@@ -0,0 +1,41 @@
+"""Accession list as text array
+
+Revision ID: 9a41d6c3e2b8
+Revises: 5c2e8f1a9d47
+Create Date: 2026-10-15 11:03:52.640118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41d6c3e2b8'
+down_revision: Union[str, None] = '5c2e8f1a9d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER COLUMN ... USING does not accept subqueries, so the list is copied through a new column.
+    op.add_column('files', sa.Column('accession_list_array', postgresql.ARRAY(sa.Text()), nullable=True))
+    op.execute(
+        "UPDATE files SET accession_list_array = "
+        "ARRAY(SELECT json_array_elements_text(accession_list)) "
+        "WHERE json_typeof(accession_list) = 'array'"
+    )
+    op.drop_column('files', 'accession_list')
+    op.alter_column('files', 'accession_list_array', new_column_name='accession_list')
+
+
+def downgrade() -> None:
+    op.add_column('files', sa.Column('accession_list_json', sa.JSON(), nullable=True))
+    op.execute(
+        "UPDATE files SET accession_list_json = array_to_json(accession_list) "
+        "WHERE accession_list IS NOT NULL"
+    )
+    op.drop_column('files', 'accession_list')
+    op.alter_column('files', 'accession_list_json', new_column_name='accession_list')
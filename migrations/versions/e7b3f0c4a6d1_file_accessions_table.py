@@ -0,0 +1,47 @@
+"""File accessions table
+
+Revision ID: e7b3f0c4a6d1
+Revises: 9a41d6c3e2b8
+Create Date: 2026-10-15 12:27:09.518846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3f0c4a6d1'
+down_revision: Union[str, None] = '9a41d6c3e2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # files.uuid was added as a plain column, the foreign key below needs it to be unique.
+    op.create_unique_constraint('uq_files_uuid', 'files', ['uuid'])
+    op.create_table('file_accessions',
+    sa.Column('file_uuid', sa.UUID(), nullable=False),
+    sa.Column('idx', sa.Integer(), nullable=False),
+    sa.Column('accession', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['file_uuid'], ['files.uuid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('file_uuid', 'idx')
+    )
+    op.execute(
+        "INSERT INTO file_accessions (file_uuid, idx, accession) "
+        "SELECT files.uuid, accessions.ordinality - 1, accessions.accession "
+        "FROM files, unnest(files.accession_list) WITH ORDINALITY AS accessions(accession, ordinality)"
+    )
+    op.drop_column('files', 'accession_list')
+
+
+def downgrade() -> None:
+    op.add_column('files', sa.Column('accession_list', postgresql.ARRAY(sa.Text()), nullable=True))
+    op.execute(
+        "UPDATE files SET accession_list = ARRAY("
+        "SELECT accession FROM file_accessions WHERE file_accessions.file_uuid = files.uuid ORDER BY idx)"
+    )
+    op.drop_table('file_accessions')
+    op.drop_constraint('uq_files_uuid', 'files', type_='unique')
@@ -2,19 +2,25 @@ from datetime import datetime
 from typing import AsyncGenerator
 
 from fastapi import Depends
-from sqlalchemy import Column, String, Boolean, Integer, TIMESTAMP, ForeignKey, MetaData, NullPool
+from sqlalchemy import Column, String, Boolean, Integer, TIMESTAMP, ForeignKey, MetaData, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import DeclarativeMeta, declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from config.config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from config.config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, DB_POOL_SIZE, DB_MAX_OVERFLOW
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 Base = declarative_base()
 
 metadata = MetaData()
 
-engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+)
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -40,4 +46,15 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
            or other asynchronous operation to ensure proper resource management.
      """
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+async def warm_up_pool() -> None:
+    """
+     Opens a first connection of the engine pool so the first request does not pay the connection setup.
+
+     Notes:
+         - The connection is returned to the pool after running a trivial query.
+     """
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
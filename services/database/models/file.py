@@ -1,8 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, JSON, TIMESTAMP, Float, UUID
-from sqlalchemy.ext.mutable import MutableList
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, ForeignKey, Text, TIMESTAMP, Float, UUID
 from sqlalchemy.ext.declarative import declarative_base
 
 
@@ -11,10 +10,16 @@ Base = declarative_base()
 class File(Base):
     __tablename__ = 'files'
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    download_task_id = Column(Integer,nullable=False)
+    download_task_id = Column(BigInteger, nullable=False, unique=True, index=True)
     size = Column(Float, nullable=True)
     url = Column(String, nullable=False)
     status = Column(String,default="Waiting for download")
     result_count = Column(Integer,default=0)
-    accession_list = Column(MutableList.as_mutable(JSON),default=list)
     created_at = Column(DateTime,default=datetime.datetime.utcnow)
+
+
+class FileAccession(Base):
+    __tablename__ = 'file_accessions'
+    file_uuid = Column(UUID(as_uuid=True), ForeignKey('files.uuid', ondelete='CASCADE'), primary_key=True)
+    idx = Column(Integer, primary_key=True)
+    accession = Column(Text, nullable=False)
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from services.database.database import engine
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL channel on which task status changes are published, with "<task_id>:<status>" payloads.
+STATUS_CHANNEL = "file_status"
+# Seconds between two attempts to reconnect the listening connection after it was lost.
+RECONNECT_DELAY = 5
+
+
+class StatusListener:
+    """
+     Listens to the task status notifications published by PostgreSQL and dispatches them to subscribers.
+
+     A single database connection per process runs LISTEN on the status channel, so the number of
+     clients waiting for status changes does not affect the number of database connections in use.
+     If that connection is lost, it is replaced in the background, and the subscribers receive None
+     to tell them that notifications may have been missed and the status should be read again.
+
+     Attributes:
+         subscribers (defaultdict): The queues receiving the statuses, grouped by task ID.
+     """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self._connection = None
+        self._driver_connection = None
+        self._reconnect_task = None
+
+    async def start(self) -> None:
+        """
+         Checks out a connection from the engine pool and starts listening on the status channel.
+         """
+        self._connection = await engine.connect()
+        raw_connection = await self._connection.get_raw_connection()
+        self._driver_connection = raw_connection.driver_connection
+        self._driver_connection.add_termination_listener(self._on_termination)
+        await self._driver_connection.add_listener(STATUS_CHANNEL, self._on_notification)
+
+    async def stop(self) -> None:
+        """
+         Stops listening on the status channel and returns the connection to the engine pool.
+         """
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            await asyncio.gather(self._reconnect_task, return_exceptions=True)
+
+        if self._driver_connection is not None and not self._driver_connection.is_closed():
+            self._driver_connection.remove_termination_listener(self._on_termination)
+            await self._driver_connection.remove_listener(STATUS_CHANNEL, self._on_notification)
+        if self._connection is not None:
+            await self._connection.close()
+
+    def subscribe(self, task_id: int) -> asyncio.Queue:
+        """
+         Registers a new subscriber to the status changes of a task.
+
+         Args:
+             task_id (int): The ID of the task to follow.
+
+         Returns:
+             asyncio.Queue: The queue receiving the new statuses of the task.
+         """
+        queue = asyncio.Queue()
+        self.subscribers[task_id].add(queue)
+        return queue
+
+    def unsubscribe(self, task_id: int, queue: asyncio.Queue) -> None:
+        """
+         Removes a subscriber registered with subscribe.
+
+         Args:
+             task_id (int): The ID of the followed task.
+             queue (asyncio.Queue): The queue returned by subscribe.
+         """
+        queues = self.subscribers.get(task_id)
+        if queues is None:
+            return
+
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[task_id]
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        task_id, _, status = payload.partition(":")
+        try:
+            queues = self.subscribers.get(int(task_id), ())
+        except ValueError:
+            logger.warning(f"Malformed status notification: {payload}")
+            return
+
+        for queue in queues:
+            queue.put_nowait(status)
+
+    def _on_termination(self, connection) -> None:
+        logger.error("The status listener connection was closed, reconnecting")
+        self._wake_subscribers()
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """
+         Replaces the lost listening connection, retrying every RECONNECT_DELAY seconds until it succeeds.
+         """
+        connection, self._connection, self._driver_connection = self._connection, None, None
+        if connection is not None:
+            # The connection is dead, so it is discarded rather than returned to the pool.
+            await connection.invalidate()
+            await connection.close()
+
+        while True:
+            try:
+                await self.start()
+            except Exception as e:
+                logger.error(f"Failed to reconnect the status listener: {e}")
+                if self._connection is not None:
+                    await self._connection.invalidate()
+                    await self._connection.close()
+                    self._connection, self._driver_connection = None, None
+                await asyncio.sleep(RECONNECT_DELAY)
+            else:
+                break
+
+        logger.info("The status listener is listening again")
+        # Statuses may have changed while nothing was listening.
+        self._wake_subscribers()
+
+    def _wake_subscribers(self) -> None:
+        for queues in self.subscribers.values():
+            for queue in queues:
+                queue.put_nowait(None)
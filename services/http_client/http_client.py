@@ -0,0 +1,51 @@
+import ssl
+
+import aiohttp
+from fastapi import Request
+
+try:
+    from zlib_ng import zlib_ng
+except ImportError:
+    zlib_ng = None
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """
+     Creates the aiohttp client session shared by all downloads of the application.
+
+     Returns:
+         aiohttp.ClientSession: A client session backed by a pooled TCP connector.
+
+     Notes:
+         - The connector keeps connections alive and caches DNS lookups for ten minutes, so consecutive downloads
+           from the same host reuse sockets instead of paying a new DNS lookup and TCP/TLS handshake each time.
+         - A single SSL context is built for the whole process and shared by all connections of the session.
+         - The session is created on application startup and must be closed on shutdown.
+         - When zlib-ng is installed, aiohttp uses it to decode compressed transfer encodings.
+     """
+    if zlib_ng is not None:
+        aiohttp.set_zlib_backend(zlib_ng)
+
+    ssl_context = ssl.create_default_context()
+    connector = aiohttp.TCPConnector(
+        ssl=ssl_context,
+        limit=100,
+        limit_per_host=10,
+        use_dns_cache=True,
+        ttl_dns_cache=600,
+        keepalive_timeout=75,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def get_http_session(request: Request) -> aiohttp.ClientSession:
+    """
+     Provides the shared aiohttp client session for dependency injection in FastAPI.
+
+     Args:
+         request (Request): The incoming request, used to reach the application state.
+
+     Returns:
+         aiohttp.ClientSession: The client session created on application startup.
+     """
+    return request.app.state.http
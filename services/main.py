@@ -1,10 +1,40 @@
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
 from fastapi import FastAPI
-from services.routers.file import router as file_router
+from fastapi.responses import ORJSONResponse
+from services.routers.file import router as file_router, finish_downloads
+from services.http_client.http_client import create_http_session
+from services.database.database import engine, warm_up_pool
+from services.database.notifications import StatusListener
+from services.parse_pool.parse_pool import ParsePool
+from config.config import MAX_CONCURRENT_DOWNLOADS, PARSE_WORKERS, DOWNLOAD_SHUTDOWN_TIMEOUT
 
 app = FastAPI(
     title="FIle downloader",
-    debug= True
+    debug= True,
+    default_response_class=ORJSONResponse
 
 
 )
 app.include_router(file_router, prefix="/file", tags=["FileManager"])
+
+
+@app.on_event("startup")
+async def startup():
+    app.state.http = create_http_session()
+    app.state.dl_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    app.state.parse_pool = ParsePool(functools.partial(ProcessPoolExecutor, max_workers=PARSE_WORKERS))
+    await warm_up_pool()
+    app.state.status_listener = StatusListener()
+    await app.state.status_listener.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await finish_downloads(DOWNLOAD_SHUTDOWN_TIMEOUT)
+    await app.state.http.close()
+    await app.state.status_listener.stop()
+    await engine.dispose()
+    app.state.parse_pool.shutdown()
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ParsePool:
+    """
+     Runs the ACCESSION number extraction in an executor shared by all downloads, and replaces the executor
+     when it breaks.
+
+     A process pool whose worker died abruptly fails its pending jobs with BrokenProcessPool and rejects every
+     new one. The first job to report it replaces the executor, so the following jobs run in a new pool.
+
+     Attributes:
+         executor (Executor): The executor the jobs are currently submitted to.
+     """
+
+    def __init__(self, create_executor: Callable[[], Executor]):
+        self._create_executor = create_executor
+        self.executor = create_executor()
+
+    async def run(self, func: Callable, *args):
+        """
+         Runs a function in the executor.
+
+         Args:
+             func (Callable): The function to run.
+             *args: The arguments of the function.
+
+         Returns:
+             The return value of the function.
+
+         Raises:
+             BrokenProcessPool: If the executor broke before the function completed. The executor is replaced,
+             and the function is not retried.
+         """
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            if self.executor is executor:
+                logger.warning("The parse pool is broken and is replaced")
+                self.executor = self._create_executor()
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def shutdown(self) -> None:
+        """
+         Shuts the executor down without waiting for the running jobs, and cancels the queued ones.
+         """
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,18 +1,41 @@
-import random
-from typing import Optional
-
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
-from sqlalchemy import select
+import asyncio
+import collections
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Union
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, WebSocket, WebSocketDisconnect
+from sqlalchemy import Text, func, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
-from services.schemas.file import FileDownloadRequest, FileDownloadResponse, FileStatusResponse
-from services.database.database import get_async_session
-from services.database.models.file import File
+from config.config import URL_VALIDATION_SKIP_HOSTS
+from services.schemas.file import FileDownloadRequest, FileDownloadResponse, FileStatusResponse, FileStatusSummary
+from services.database.database import get_async_session, async_session_maker
+from services.http_client.http_client import get_http_session
+from services.database.models.file import File, FileAccession
+from services.database.notifications import STATUS_CHANNEL
+from services.parse_pool.parse_pool import ParsePool
 import aiohttp
-import io
-import gzip
+import asyncpg
 import logging
+import re
+import threading
+
+try:
+    from isal import isal_zlib as zlib
+except ImportError:
+    try:
+        from zlib_ng import zlib_ng as zlib
+    except ImportError:
+        import zlib
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -21,13 +44,129 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Size of the chunks read from the HTTP response while streaming a download.
+READ_BUFFER_SIZE = 128 * 1024
+# wbits value telling the decompressor to expect a gzip header and trailer.
+GZIP_WBITS = 31
+# Upper bound of the data decompressed per step. Lines longer than this still accumulate in the buffer.
+DECOMPRESS_BUFFER_SIZE = 1024 * 1024
+# Timeout of the HEAD request validating a download URL.
+URL_VALIDATION_TIMEOUT = aiohttp.ClientTimeout(total=5)
+# Number of decompressed blocks waiting in the process pool before the download waits for their results.
+MAX_PENDING_PARSES = 8
+# Number of ACCESSION numbers returned by the status endpoint.
+DISPLAY_ACCESSIONS_LIMIT = 20
+# Number of task IDs accepted by a single request to the multi-task status endpoint.
+MAX_STATUS_IDS = 100
+# Seconds a WebSocket waits for a status notification before reading the status from the database again.
+STATUS_RECHECK_INTERVAL = 30
+# Range of the BIGINT column the task IDs are stored in.
+BIGINT_MIN = -(1 << 63)
+BIGINT_MAX = (1 << 63) - 1
+# First token following the ACCESSION keyword at the start of a line. Anchoring on the preceding newline
+# instead of ^ lets the regex engine search for the literal prefix rather than trying every position.
+ACCESSION_RE = re.compile(rb"\nACCESSION[ \t]+(\S+)")
+# Same token on the first line of the data, which has no preceding newline.
+LEADING_ACCESSION_RE = re.compile(rb"ACCESSION[ \t]+(\S+)")
+# Token starting at a given position, used to slice the ACCESSION numbers located by Hyperscan.
+TOKEN_RE = re.compile(rb"\S+")
+
+if hyperscan is not None:
+    # Hyperscan reports match ends only, so the pattern stops at the first character of the ACCESSION number.
+    ACCESSION_DB = hyperscan.Database()
+    ACCESSION_DB.compile(expressions=[rb"^ACCESSION[ \t]+\S"], ids=[0], flags=[hyperscan.HS_FLAG_MULTILINE])
+else:
+    ACCESSION_DB = None
+# Per-thread Hyperscan scratch space, allocated on first use.
+hyperscan_scratch = threading.local()
+
 router = APIRouter(
     prefix='/file',
     tags=["FileManager"]
 )
 
+# Strong references to the running download tasks, so they are not garbage collected before completion.
+download_tasks = set()
+
+
+def get_download_semaphore(request: Request) -> asyncio.Semaphore:
+    """
+      Provides the semaphore bounding the number of concurrent downloads for dependency injection in FastAPI.
+
+      Args:
+          request (Request): The incoming request, used to reach the application state.
+
+      Returns:
+          asyncio.Semaphore: The semaphore created on application startup.
+      """
+    return request.app.state.dl_semaphore
+
+
+def get_parse_pool(request: Request) -> ParsePool:
+    """
+      Provides the pool used to extract ACCESSION numbers for dependency injection in FastAPI.
+
+      Args:
+          request (Request): The incoming request, used to reach the application state.
+
+      Returns:
+          ParsePool: The pool created on application startup.
+      """
+    return request.app.state.parse_pool
+
+
+async def run_download(url: str, task_id: int, http_session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                       parse_pool: ParsePool):
+    """
+      Runs a download task in the background with its own database session.
+
+      Args:
+          url (str): The URL of the file to download.
+          task_id (int): The ID of the task associated with the download.
+          http_session (aiohttp.ClientSession): The shared client session used to download the file.
+          semaphore (asyncio.Semaphore): The semaphore bounding the number of concurrent downloads.
+          parse_pool (ParsePool): The pool the ACCESSION numbers are extracted in.
+
+      Returns:
+          None
+
+      The database session is opened only once the semaphore is acquired, so waiting downloads do not hold
+      pooled connections. If the task is cancelled, it is marked as failed with a new session, since the
+      cancelled one may be in the middle of a statement.
+      """
+    try:
+        async with semaphore:
+            async with async_session_maker() as session:
+                await download_and_process_file(url, task_id, session, http_session, parse_pool)
+    except asyncio.CancelledError:
+        async with async_session_maker() as session:
+            await update_file_status(session, task_id, "Failed due to a shutdown")
+        raise
+
 
-async def download_and_process_file(url: str, task_id: int, session: AsyncSession):
+async def finish_downloads(timeout: float):
+    """
+      Waits for the running download tasks on shutdown and cancels those still running after the timeout.
+
+      Args:
+          timeout (float): The number of seconds given to the running downloads to complete.
+
+      Returns:
+          None
+
+      Cancelled downloads are marked as failed by run_download before this function returns.
+      """
+    if not download_tasks:
+        return
+
+    _, pending = await asyncio.wait(set(download_tasks), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def download_and_process_file(url: str, task_id: int, session: AsyncSession,
+                                    http_session: aiohttp.ClientSession, parse_pool: ParsePool):
     """
        Downloads a file from the specified URL, decompresses it, parses the content to extract ACCESSION numbers,
        and updates the status of the task in the database.
@@ -36,34 +175,70 @@ async def download_and_process_file(url: str, task_id: int, session: AsyncSessio
            url (str): The URL of the file to download.
            task_id (int): The ID of the task associated with the download.
            session (AsyncSession): The SQLAlchemy async session used to interact with the database.
+           http_session (aiohttp.ClientSession): The shared client session used to download the file.
+           parse_pool (ParsePool): The pool the ACCESSION numbers are extracted in.
 
        Returns:
            None
 
        This function performs the following steps:
        1. Downloads the file from the provided URL.
-       2. Reads and decompresses the file content.
-       3. Extracts ACCESSION numbers from the decompressed file data.
+       2. Streams the response body through a gzip decompressor chunk by chunk, member after member.
+       3. Extracts ACCESSION numbers from the completed lines in the process pool while the download goes on.
        4. Updates the status of the task in the database based on the outcome of these operations.
+
+       The parses still pending when the download stops early are cancelled.
        """
-    try:
-        async with aiohttp.ClientSession() as client_session:
-            async with client_session.get(url) as response:
-                if response.status != 200:
-                    await update_file_status(session, task_id, "Failed to download")
-                    return
+    pending_parses = collections.deque()
 
-                file_content = io.BytesIO(await response.read())
+    try:
+        async with http_session.get(url) as response:
+            if response.status != 200:
+                await update_file_status(session, task_id, "Failed to download")
+                return
 
-                try:
-                    with gzip.open(file_content, 'rt') as gzip_file:
-                        file_data = gzip_file.read()
-                except gzip.BadGzipFile:
-                    await update_file_status(session, task_id, "Failed to decompress")
-                    return
+            accession_list = []
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+            buffer = bytearray()
+
+            try:
+                async for chunk in response.content.iter_chunked(READ_BUFFER_SIZE):
+                    while chunk:
+                        if decompressor.eof:
+                            # Concatenated gzip members: the next member starts where the previous one ended.
+                            # Zero padding between or after members is skipped, as gzip.open does.
+                            chunk = chunk.lstrip(b"\x00")
+                            if not chunk:
+                                break
+                            decompressor = zlib.decompressobj(GZIP_WBITS)
+
+                        # The buffer holds no newline before the new output, so only the new output is searched.
+                        searched = len(buffer)
+                        buffer += decompressor.decompress(chunk, DECOMPRESS_BUFFER_SIZE)
+                        chunk = decompressor.unused_data if decompressor.eof else decompressor.unconsumed_tail
+                        end = buffer.rfind(b"\n", searched) + 1
+                        if not end:
+                            continue
+
+                        with memoryview(buffer)[:end] as lines:
+                            block = bytes(lines)
+                        del buffer[:end]
+
+                        pending_parses.append(asyncio.create_task(parse_block(parse_pool, block)))
+                        if len(pending_parses) > MAX_PENDING_PARSES:
+                            accession_list.extend(await pending_parses.popleft())
+
+                buffer += decompressor.flush()
+                if not decompressor.eof:
+                    raise zlib.error("Compressed data ended before the end-of-stream marker was reached")
+            except zlib.error:
+                await update_file_status(session, task_id, "Failed to decompress")
+                return
 
-                accession_list = extract_accession_numbers(file_data)
-                await update_file_status(session, task_id, "Completed", accession_list)
+            while pending_parses:
+                accession_list.extend(await pending_parses.popleft())
+            accession_list.extend(extract_accession_numbers(buffer))
+            await update_file_status(session, task_id, "Completed", accession_list)
 
     except aiohttp.ClientError as e:
         logger.error(f"HTTP request failed: {e}")
@@ -71,26 +246,93 @@ async def download_and_process_file(url: str, task_id: int, session: AsyncSessio
     except Exception as e:
         logger.exception("An unexpected error occurred in download_and_process_file")
         await update_file_status(session, task_id, "Failed due to an unexpected error")
+    finally:
+        # Parses left behind by a failed or cancelled download would keep the pool busy for nothing.
+        for parse in pending_parses:
+            parse.cancel()
+        await asyncio.gather(*pending_parses, return_exceptions=True)
 
 
-def extract_accession_numbers(file_data: str) -> list:
+async def parse_block(parse_pool: ParsePool, block: bytes) -> list:
+    """
+       Extracts the ACCESSION numbers of a block of complete lines in the process pool.
+
+       Args:
+           parse_pool (ParsePool): The pool the ACCESSION numbers are extracted in.
+           block (bytes): The decompressed lines to parse.
+
+       Returns:
+           list: The ACCESSION numbers found in the block.
+
+       If a pool worker died and the pool is broken, the block is parsed inline instead, so the download
+       does not fail on account of the pool. The pool itself is replaced by ParsePool.run.
+       """
+    try:
+        return await parse_pool.run(extract_accession_numbers, block)
+    except BrokenProcessPool:
+        logger.error("The parse pool is broken, parsing the block inline")
+        return extract_accession_numbers(block)
+
+
+def extract_accession_numbers(file_data: Union[bytes, bytearray, memoryview]) -> list:
     """
        Extracts ACCESSION numbers from the provided file data.
 
        Args:
-           file_data (str): The content of the file as a string.
+           file_data (Union[bytes, bytearray, memoryview]): The decompressed content of the file.
 
        Returns:
            list: A list of extracted ACCESSION numbers.
 
-       This function processes the file content line by line, searching for lines that start with "ACCESSION"
-       and extracts the number following this keyword.
+       This function scans the file content for lines that start with "ACCESSION" and captures the number
+       following this keyword. The scan uses a Hyperscan database when the library is installed and a
+       precompiled regular expression otherwise. The content is scanned as bytes, so only the matched
+       numbers are decoded, as UTF-8 with invalid bytes replaced so a malformed number does not fail the file.
+       """
+    if ACCESSION_DB is not None:
+        accessions = find_accessions_with_hyperscan(file_data)
+    else:
+        accessions = find_accessions_with_regex(file_data)
+    return [accession.decode('utf-8', errors='replace') for accession in accessions]
+
+
+def find_accessions_with_hyperscan(file_data: Union[bytes, bytearray, memoryview]) -> list:
+    """
+       Finds the ACCESSION numbers of the file data with the Hyperscan database.
+
+       Args:
+           file_data (Union[bytes, bytearray, memoryview]): The decompressed content of the file.
+
+       Returns:
+           list: The ACCESSION numbers found, as bytes.
+
+       Hyperscan scratch space cannot be shared by concurrent scans, so each thread uses its own.
+       """
+    scratch = getattr(hyperscan_scratch, "scratch", None)
+    if scratch is None:
+        scratch = hyperscan_scratch.scratch = hyperscan.Scratch(ACCESSION_DB)
+
+    match_ends = []
+    ACCESSION_DB.scan(file_data, scratch=scratch,
+                      match_event_handler=lambda pattern_id, start, end, flags, context: match_ends.append(end))
+    return [TOKEN_RE.match(file_data, end - 1).group() for end in match_ends]
+
+
+def find_accessions_with_regex(file_data: Union[bytes, bytearray, memoryview]) -> list:
+    """
+       Finds the ACCESSION numbers of the file data with the precompiled regular expressions.
+
+       Args:
+           file_data (Union[bytes, bytearray, memoryview]): The decompressed content of the file.
+
+       Returns:
+           list: The ACCESSION numbers found, as bytes.
        """
-    accession_list = []
-    for line in file_data.splitlines():
-        if line.startswith("ACCESSION"):
-            accession_list.append(line.split()[1])
-    return accession_list
+    accessions = ACCESSION_RE.findall(file_data)
+    leading = LEADING_ACCESSION_RE.match(file_data)
+    if leading:
+        accessions.insert(0, leading.group(1))
+    return accessions
 
 
 async def update_file_status(session: AsyncSession, task_id: int, status: str, accession_list: Optional[list] = None):
@@ -107,73 +349,195 @@ async def update_file_status(session: AsyncSession, task_id: int, status: str, a
           None
 
       This function updates the status of the task in the database and optionally updates additional fields
-      such as the ACCESSION list and result count.
+      such as the result count, using a single UPDATE statement without loading the record. The ACCESSION
+      numbers are stored as rows of the file_accessions table, and the new status is published on the
+      status notification channel, in the same transaction.
       """
+    values = {"status": status}
+    if accession_list is not None:
+        values["result_count"] = len(accession_list)
+
+    stmt = (
+        update(File)
+        .where(File.download_task_id == task_id)
+        .values(**values)
+        .returning(File.uuid)
+        .execution_options(synchronize_session=False)
+    )
+
     try:
         async with session.begin():
-            result = await session.execute(select(File).filter_by(download_task_id=task_id))
-            file_record = result.scalars().first()
+            result = await session.execute(stmt)
+            file_uuid = result.scalar_one_or_none()
 
-            if not file_record:
+            if file_uuid is None:
+                logger.warning(f"No record found for task_id: {task_id}")
                 return
 
-            file_record.status = status
-            if accession_list is not None:
-                file_record.accession_list = accession_list
-                file_record.result_count = len(accession_list)
+            if accession_list:
+                await copy_accession_numbers(session, file_uuid, accession_list)
 
-            await session.commit()
-    except SQLAlchemyError as e:
+            await session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": STATUS_CHANNEL, "payload": f"{task_id}:{status}"},
+            )
+    except (SQLAlchemyError, asyncpg.PostgresError) as e:
         logger.exception("An error occurred while updating the file status")
         await session.rollback()
 
 
+async def copy_accession_numbers(session: AsyncSession, file_uuid: uuid.UUID, accession_list: list):
+    """
+      Bulk-inserts the ACCESSION numbers of a file into the file_accessions table.
+
+      Args:
+          session (AsyncSession): The SQLAlchemy async session used to interact with the database.
+          file_uuid (uuid.UUID): The UUID of the file the ACCESSION numbers belong to.
+          accession_list (list): A list of ACCESSION numbers extracted from the file, in file order.
+
+      Returns:
+          None
+
+      Raises:
+          asyncpg.PostgresError: If the COPY fails. It bypasses SQLAlchemy, so the error is not wrapped in a SQLAlchemyError.
+
+      The rows are sent with a single COPY on the session's asyncpg connection, inside the current transaction.
+      """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        FileAccession.__tablename__,
+        records=((file_uuid, idx, accession) for idx, accession in enumerate(accession_list)),
+        columns=("file_uuid", "idx", "accession"),
+    )
+
+
+async def is_url_available(http_session: aiohttp.ClientSession, url: str) -> bool:
+    """
+      Checks with a HEAD request that the file at the given URL can be downloaded.
+
+      Args:
+          http_session (aiohttp.ClientSession): The shared client session used for HTTP requests.
+          url (str): The URL of the file to download.
+
+      Returns:
+          bool: True if the URL responds with a 200 status code or its host is trusted, False otherwise.
+
+      HTTP(S) URLs on the hosts listed in URL_VALIDATION_SKIP_HOSTS are trusted without sending the request.
+      """
+    try:
+        parts = urlsplit(url)
+    except ValueError as e:
+        logger.error(f"URL validation failed: {e}")
+        return False
+
+    if parts.scheme in ("http", "https") and parts.hostname in URL_VALIDATION_SKIP_HOSTS:
+        return True
+
+    try:
+        async with http_session.head(url, timeout=URL_VALIDATION_TIMEOUT, allow_redirects=True) as response:
+            return response.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"URL validation failed: {e}")
+        return False
+
+
 @router.post("/start-download/", response_model=FileDownloadResponse)
-async def start_download(request: FileDownloadRequest, background_tasks: BackgroundTasks,
-                         session: AsyncSession = Depends(get_async_session)):
+async def start_download(request: FileDownloadRequest,
+                         session: AsyncSession = Depends(get_async_session),
+                         http_session: aiohttp.ClientSession = Depends(get_http_session),
+                         semaphore: asyncio.Semaphore = Depends(get_download_semaphore),
+                         parse_pool: ParsePool = Depends(get_parse_pool)):
     """
        Starts a file download task and schedules it for background processing.
 
        Args:
            request (FileDownloadRequest): The request body containing the URL of the file to download.
-           background_tasks (BackgroundTasks): A FastAPI utility for running background tasks.
            session (AsyncSession, optional): The SQLAlchemy async session used to interact with the database. Defaults to Depends(get_async_session).
+           http_session (aiohttp.ClientSession, optional): The shared client session used for HTTP requests. Defaults to Depends(get_http_session).
+           semaphore (asyncio.Semaphore, optional): The semaphore bounding the number of concurrent downloads. Defaults to Depends(get_download_semaphore).
+           parse_pool (ParsePool, optional): The pool the ACCESSION numbers are extracted in. Defaults to Depends(get_parse_pool).
 
        Returns:
            dict: A dictionary containing the task ID and status of the task.
 
        Raises:
-           HTTPException: If an error occurs while starting the download, a 500 status code is returned.
+           HTTPException: If the URL is invalid or an error occurs while starting the download, a 400 or 500 status code is returned respectively.
 
-       This function creates a new task record in the database, schedules the background processing of the
-       file download, and returns the task ID and initial status.
+       This function creates a new task record in the database while the URL is validated concurrently,
+       schedules the background processing of the file download, and returns the task ID and initial status.
+       If the URL turns out to be invalid, the record is marked as such and a 400 status code is returned.
        """
-    async with aiohttp.ClientSession() as client_session:
-        try:
-            async with client_session.head(request.url) as response:
-                if response.status != 200:
-                    raise HTTPException(status_code=400, detail="Invalid URL")
-
-        except aiohttp.ClientError as e:
-            logger.error(f"URL validation failed: {e}")
-            raise HTTPException(status_code=400, detail="Invalid URL")
-
-    task_id = random.randint(1, 10 ** 6)
+    # Kept within 53 bits so the ID survives JSON clients that parse numbers as doubles.
+    task_id = uuid.uuid4().int & ((1 << 53) - 1)
 
     try:
         download_task = File(download_task_id=task_id, url=request.url, status="Downloading")
         session.add(download_task)
-        await session.commit()
+        url_available, _ = await asyncio.gather(is_url_available(http_session, request.url), session.commit())
     except SQLAlchemyError as e:
         logger.exception("An error occurred while starting the download")
         raise HTTPException(status_code=500, detail="Failed to start download")
 
-    background_tasks.add_task(download_and_process_file, request.url, task_id, session)
+    if not url_available:
+        await update_file_status(session, task_id, "Invalid URL")
+        raise HTTPException(status_code=400, detail="Invalid URL")
+
+    task = asyncio.create_task(run_download(request.url, task_id, http_session, semaphore, parse_pool))
+    download_tasks.add(task)
+    task.add_done_callback(download_tasks.discard)
     return {"id": task_id, "status": "Downloading"}
 
 
+@router.get("/status", response_model=List[FileStatusSummary])
+async def check_statuses(ids: str, session: AsyncSession = Depends(get_async_session)):
+    """
+      Retrieves the status of several file download tasks at once.
+
+      Args:
+          ids (str): A comma-separated list of the IDs of the tasks to check.
+          session (AsyncSession, optional): The SQLAlchemy async session used to interact with the database. Defaults to Depends(get_async_session).
+
+      Returns:
+          list: A list of dictionaries containing the ID, status and result count of each task found.
+
+      Raises:
+          HTTPException: If the IDs are malformed, out of range or too many, or an error occurs while retrieving the statuses, a 400 or 500 status code is returned respectively.
+
+      This function fetches up to MAX_STATUS_IDS tasks with a single query and leaves out their ACCESSION numbers,
+      which are available through the single-task status endpoint. Unknown IDs are omitted from the result.
+      """
+    try:
+        task_ids = [int(task_id) for task_id in ids.split(",") if task_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid task IDs")
+
+    if len(task_ids) > MAX_STATUS_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATUS_IDS} task IDs can be requested at once")
+    if not all(BIGINT_MIN <= task_id <= BIGINT_MAX for task_id in task_ids):
+        raise HTTPException(status_code=400, detail="Invalid task IDs")
+
+    stmt = (
+        select(File.download_task_id, File.status, File.result_count)
+        .where(File.download_task_id.in_(task_ids))
+    )
+
+    try:
+        async with session.begin():
+            result = await session.execute(stmt)
+
+            return [
+                {"id": row.download_task_id, "status": row.status, "result_count": row.result_count}
+                for row in result
+            ]
+    except SQLAlchemyError as e:
+        logger.exception("An error occurred while checking the statuses")
+        raise HTTPException(status_code=500, detail="Failed to retrieve statuses")
+
+
 @router.get("/status/{task_id}", response_model=FileStatusResponse)
-async def check_status(task_id: int, session: AsyncSession = Depends(get_async_session)):
+async def check_status(task_id: int = Path(ge=BIGINT_MIN, le=BIGINT_MAX),
+                       session: AsyncSession = Depends(get_async_session)):
     """
       Retrieves the status of a file download task.
 
@@ -188,16 +552,31 @@ async def check_status(task_id: int, session: AsyncSession = Depends(get_async_s
           HTTPException: If the task is not found or an error occurs while retrieving the status, a 404 or 500 status code is returned respectively.
 
       This function queries the database for the status of the specified task and returns relevant information.
+      Task IDs outside the BIGINT range are rejected by the path validation with a 422 status code.
+      Only the first ACCESSION numbers are fetched, in the same query, without loading the file record.
       """
+    accessions = (
+        select(FileAccession.accession)
+        .where(FileAccession.file_uuid == File.uuid)
+        .order_by(FileAccession.idx)
+        .limit(DISPLAY_ACCESSIONS_LIMIT)
+        .correlate(File)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(File.status, File.result_count, func.array(accessions, type_=ARRAY(Text)).label("accession_list"))
+        .where(File.download_task_id == task_id)
+    )
+
     try:
         async with session.begin():
-            result = await session.execute(select(File).filter_by(download_task_id=task_id))
-            file_record = result.scalars().first()
+            result = await session.execute(stmt)
+            file_record = result.first()
 
             if not file_record:
                 raise HTTPException(status_code=404, detail="Task not found")
 
-            display_accessions = file_record.accession_list[:20] if file_record.accession_list else []
+            display_accessions = list(file_record.accession_list)
             display_accessions.append('...')
 
             return {
@@ -208,3 +587,94 @@ async def check_status(task_id: int, session: AsyncSession = Depends(get_async_s
     except SQLAlchemyError as e:
         logger.exception("An error occurred while checking the status")
         raise HTTPException(status_code=500, detail="Failed to retrieve status")
+
+
+@router.websocket("/status/ws/{task_id}")
+async def stream_status(websocket: WebSocket, task_id: int = Path(ge=BIGINT_MIN, le=BIGINT_MAX)):
+    """
+      Streams the status of a file download task over a WebSocket until the task is over.
+
+      Args:
+          websocket (WebSocket): The WebSocket connection to the client.
+          task_id (int): The ID of the task to follow.
+
+      Returns:
+          None
+
+      This function sends the current status of the task, then every status change published by
+      update_file_status, and closes the connection once the task is no longer downloading. The connection
+      is closed with a 1008 code if the task ID is out of range or the task is not found, and with a 1011 code
+      if the status cannot be read from the database. The status is read again from the database when
+      no notification arrives for STATUS_RECHECK_INTERVAL seconds or the status listener reports that
+      notifications may have been missed, and the client disconnecting is noticed while waiting.
+      """
+    status_listener = websocket.app.state.status_listener
+    statuses = status_listener.subscribe(task_id)
+    next_status = None
+    client_message = None
+
+    try:
+        await websocket.accept()
+        status = await read_task_status(task_id)
+        next_status = asyncio.create_task(statuses.get())
+        client_message = asyncio.create_task(websocket.receive())
+        sent_status = None
+
+        while True:
+            if status is None:
+                await websocket.close(code=1008, reason="Task not found")
+                return
+
+            if status != sent_status:
+                await websocket.send_json({"status": status})
+                sent_status = status
+            if status != "Downloading":
+                break
+
+            done, _ = await asyncio.wait({next_status, client_message}, timeout=STATUS_RECHECK_INTERVAL,
+                                         return_when=asyncio.FIRST_COMPLETED)
+
+            if client_message in done:
+                if client_message.result()["type"] == "websocket.disconnect":
+                    return
+                # Messages from the client are ignored.
+                client_message = asyncio.create_task(websocket.receive())
+
+            if next_status in done:
+                status = next_status.result()
+                next_status = asyncio.create_task(statuses.get())
+                if status is None:
+                    status = await read_task_status(task_id)
+            elif not done:
+                status = await read_task_status(task_id)
+
+        await websocket.close()
+    except SQLAlchemyError as e:
+        logger.exception("An error occurred while streaming the status")
+        try:
+            await websocket.close(code=1011, reason="Failed to retrieve status")
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+    except (WebSocketDisconnect, RuntimeError):
+        # The client went away, possibly while a message was being sent to it.
+        pass
+    finally:
+        for task in (next_status, client_message):
+            if task is not None:
+                task.cancel()
+        status_listener.unsubscribe(task_id, statuses)
+
+
+async def read_task_status(task_id: int) -> Optional[str]:
+    """
+      Reads the status of a file download task from the database with a new session.
+
+      Args:
+          task_id (int): The ID of the task.
+
+      Returns:
+          Optional[str]: The status of the task, or None if the task is not found.
+      """
+    async with async_session_maker() as session:
+        result = await session.execute(select(File.status).where(File.download_task_id == task_id))
+        return result.scalar_one_or_none()
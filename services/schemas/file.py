@@ -26,6 +26,19 @@ class FileStatusResponse(BaseModel):
     result_count: Optional[int] = None
     accession_list: Optional[List[str]] = None
 
+class FileStatusSummary(BaseModel):
+    """
+       Response model for one task of a batch status check.
+
+       Attributes:
+           id (int): The ID of the file download task.
+           status (str): The current status of the file download task.
+           result_count (Optional[int]): The number of results obtained from processing the file (e.g., number of ACCESSION numbers).
+       """
+    id: int
+    status: str
+    result_count: Optional[int] = None
+
 class FileDownloadResponse(BaseModel):
     """
     Response model for the initiation of a file download task.
@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for name, value in {"DB_HOST": "localhost", "DB_PORT": "5432", "DB_USER": "postgres",
+                    "DB_PASS": "postgres", "DB_NAME": "postgres"}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,204 @@
+import asyncio
+import contextlib
+import gzip
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from services.parse_pool.parse_pool import ParsePool
+from services.routers import file as file_router
+
+
+def make_records(start, count):
+    return b"".join(
+        b"LOCUS       X%06d\nACCESSION   AB%06d\nORIGIN\n" % (i, i) + b"acgt" * 100 + b"\n//\n"
+        for i in range(start, start + count)
+    )
+
+
+class FakeContent:
+    def __init__(self, body, chunk_size):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+
+class FakeResponse:
+    def __init__(self, body, chunk_size):
+        self.status = 200
+        self.content = FakeContent(body, chunk_size)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeHttpSession:
+    def __init__(self, body, chunk_size):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    def get(self, url):
+        return FakeResponse(self.body, self.chunk_size)
+
+
+@pytest.fixture
+def status_updates(monkeypatch):
+    updates = []
+
+    async def fake_update_file_status(session, task_id, status, accession_list=None):
+        updates.append((status, accession_list))
+
+    monkeypatch.setattr(file_router, "update_file_status", fake_update_file_status)
+    return updates
+
+
+class BreakingPool(ThreadPoolExecutor):
+    """Runs the first jobs, then fails the running ones and rejects new ones as a broken process pool does."""
+
+    def __init__(self, healthy_jobs):
+        super().__init__(max_workers=2)
+        self.healthy_jobs = healthy_jobs
+
+    def submit(self, fn, *args, **kwargs):
+        self.healthy_jobs -= 1
+        if self.healthy_jobs >= 0:
+            return super().submit(fn, *args, **kwargs)
+        if self.healthy_jobs == -1:
+            future = Future()
+            future.set_exception(BrokenProcessPool("A worker died"))
+            return future
+        raise BrokenProcessPool("A worker died")
+
+
+class RecordingPool(ThreadPoolExecutor):
+    """Runs the jobs on a single thread and keeps their futures."""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.futures = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = super().submit(fn, *args, **kwargs)
+        self.futures.append(future)
+        return future
+
+
+def download(body, chunk_size, create_executor=lambda: ThreadPoolExecutor(max_workers=2)):
+    parse_pool = ParsePool(create_executor)
+
+    async def run():
+        try:
+            await file_router.download_and_process_file(
+                "http://example.org/file.gz", 1, None, FakeHttpSession(body, chunk_size), parse_pool)
+        finally:
+            parse_pool.executor.shutdown()
+
+    asyncio.run(run())
+    return parse_pool
+
+
+def expected_accessions(start, count):
+    return ["AB%06d" % i for i in range(start, start + count)]
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 128 * 1024])
+def test_single_member(status_updates, chunk_size):
+    download(gzip.compress(make_records(0, 3000)), chunk_size)
+
+    assert status_updates == [("Completed", expected_accessions(0, 3000))]
+
+
+@pytest.mark.parametrize("chunk_size", [997, 128 * 1024])
+def test_multiple_members(status_updates, chunk_size):
+    body = (gzip.compress(make_records(0, 2000))
+            + gzip.compress(make_records(2000, 3000))
+            + gzip.compress(make_records(5000, 10))
+            + b"\x00" * 512)
+
+    download(body, chunk_size)
+
+    assert status_updates == [("Completed", expected_accessions(0, 5010))]
+
+
+def test_line_longer_than_a_decompression_step(status_updates):
+    long_line = b"a" * (3 * file_router.DECOMPRESS_BUFFER_SIZE + 1) + b"\n"
+    body = gzip.compress(make_records(0, 10) + long_line + make_records(10, 10))
+
+    download(body, 128 * 1024)
+
+    assert status_updates == [("Completed", expected_accessions(0, 20))]
+
+
+def test_broken_parse_pool_is_replaced(status_updates):
+    executors = iter([BreakingPool(healthy_jobs=2), ThreadPoolExecutor(max_workers=2)])
+
+    parse_pool = download(gzip.compress(make_records(0, 3000)), 1000, lambda: next(executors))
+
+    assert status_updates == [("Completed", expected_accessions(0, 3000))]
+    assert not isinstance(parse_pool.executor, BreakingPool)
+
+
+def test_failed_download_cancels_pending_parses(monkeypatch, status_updates):
+    extract_accession_numbers = file_router.extract_accession_numbers
+
+    def slow_extract_accession_numbers(file_data):
+        time.sleep(0.05)
+        return extract_accession_numbers(file_data)
+
+    monkeypatch.setattr(file_router, "extract_accession_numbers", slow_extract_accession_numbers)
+    body = gzip.compress(make_records(0, 3000))
+    parse_pool = RecordingPool()
+
+    download(body[:len(body) // 2] + b"not a gzip member" * 100, 1000, lambda: parse_pool)
+
+    assert status_updates == [("Failed to decompress", None)]
+    assert any(future.cancelled() for future in parse_pool.futures)
+    assert all(future.done() for future in parse_pool.futures)
+
+
+def test_trailing_garbage_fails(status_updates):
+    download(gzip.compress(make_records(0, 100)) + b"not a gzip member", 1000)
+
+    assert status_updates == [("Failed to decompress", None)]
+
+
+def test_truncated_member_fails(status_updates):
+    body = gzip.compress(make_records(0, 100))
+    download(body + body[:len(body) // 2], 1000)
+
+    assert status_updates == [("Failed to decompress", None)]
+
+
+def test_finish_downloads_cancels_and_marks_failed(monkeypatch, status_updates):
+    async def hanging_download(*args):
+        await asyncio.sleep(3600)
+
+    @contextlib.asynccontextmanager
+    async def fake_session_maker():
+        yield None
+
+    monkeypatch.setattr(file_router, "download_and_process_file", hanging_download)
+    monkeypatch.setattr(file_router, "async_session_maker", fake_session_maker)
+
+    async def run():
+        task = asyncio.create_task(file_router.run_download("http://example.org/file.gz", 1, None,
+                                                            asyncio.Semaphore(1), None))
+        file_router.download_tasks.add(task)
+        task.add_done_callback(file_router.download_tasks.discard)
+        await asyncio.sleep(0)
+
+        await file_router.finish_downloads(0.01)
+        return task
+
+    task = asyncio.run(run())
+
+    assert task.cancelled()
+    assert status_updates == [("Failed due to a shutdown", None)]
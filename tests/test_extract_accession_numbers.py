@@ -0,0 +1,65 @@
+import pytest
+
+from services.routers import file as file_router
+
+requires_hyperscan = pytest.mark.skipif(file_router.ACCESSION_DB is None, reason="hyperscan is not installed")
+
+SAMPLES = {
+    "leading_line": b"ACCESSION   AB000001\nORIGIN\n",
+    "spaces_and_tabs": b"LOCUS\nACCESSION \t  AB000001\nACCESSION\tAB000002 AB000003\n",
+    "bare_keyword": b"LOCUS\nACCESSION\nACCESSION   \nORIGIN\nACCESSION   AB000001\n",
+    "crlf": b"LOCUS\r\nACCESSION   AB000001\r\nORIGIN\r\nACCESSION   AB000002\r\n",
+    "not_at_line_start": b"LOCUS ACCESSION   AB000001\nXACCESSION   AB000002\n",
+    "empty": b"",
+}
+
+EXPECTED = {
+    "leading_line": [b"AB000001"],
+    "spaces_and_tabs": [b"AB000001", b"AB000002"],
+    "bare_keyword": [b"AB000001"],
+    "crlf": [b"AB000001", b"AB000002"],
+    "not_at_line_start": [],
+    "empty": [],
+}
+
+
+def split_blocks(data, size):
+    """Cuts data at the last newline of every size bytes, as the download loop does."""
+    blocks = []
+    while data:
+        end = data.rfind(b"\n", 0, size) + 1 or len(data)
+        blocks.append(data[:end])
+        data = data[end:]
+    return blocks
+
+
+@pytest.mark.parametrize("name", SAMPLES)
+def test_regex_backend(name):
+    assert file_router.find_accessions_with_regex(SAMPLES[name]) == EXPECTED[name]
+
+
+@requires_hyperscan
+@pytest.mark.parametrize("name", SAMPLES)
+@pytest.mark.parametrize("wrap", [bytes, bytearray])
+def test_backends_match(name, wrap):
+    data = wrap(SAMPLES[name])
+    assert file_router.find_accessions_with_hyperscan(data) == file_router.find_accessions_with_regex(data)
+
+
+@requires_hyperscan
+@pytest.mark.parametrize("size", [7, 20, 64])
+def test_backends_match_across_blocks(size):
+    data = b"".join(SAMPLES.values())
+    hyperscan_accessions = []
+    regex_accessions = []
+    for block in split_blocks(data, size):
+        hyperscan_accessions.extend(file_router.find_accessions_with_hyperscan(block))
+        regex_accessions.extend(file_router.find_accessions_with_regex(block))
+    assert hyperscan_accessions == regex_accessions
+    assert regex_accessions == file_router.find_accessions_with_regex(data)
+
+
+def test_non_ascii_numbers_are_decoded():
+    data = b"ACCESSION   AB\xc3\xa9001\nACCESSION   AB\xff002\nACCESSION   AB000003\n"
+
+    assert file_router.extract_accession_numbers(data) == ["ABé001", "AB�002", "AB000003"]